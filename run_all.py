@@ -1,13 +1,25 @@
 #!/usr/bin/env python3
 """Run the full replication pipeline."""
 
+import argparse
+
 from src.figures import run_figures
 from src.tables import run_tables
 
 
 def main() -> None:
-    run_tables()
-    run_figures()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-parse every CSV and rebuild every output, ignoring sidecars and recorded inputs",
+    )
+    args = parser.parse_args()
+
+    # Stages skip outputs whose inputs are unchanged since they were built; load_all() is
+    # cached, so any stage that does need the data shares a single load.
+    run_tables(force=args.force)
+    run_figures(force=args.force)
     print("pipeline complete")
 
 
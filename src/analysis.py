@@ -3,17 +3,19 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from scipy import stats
 
+try:
+    from .io_cache import INPUT_PATHS, is_fresh, load_all, mark_fresh, mark_stale
+except ImportError:
+    from io_cache import INPUT_PATHS, is_fresh, load_all, mark_fresh, mark_stale
+
 ROOT = Path(__file__).resolve().parents[1]
-DATA = ROOT / "data"
 OUT = ROOT / "outputs"
-RAW = DATA / "raw"
-PROCESSED = DATA / "processed"
-STAGE1 = DATA / "stage1"
-CLASSIFIED = DATA / "classified"
 ANALYSIS = OUT / "analysis"
+MAIN_NUMBERS = ANALYSIS / "main_numbers.json"
 
 LAGARDE_APPOINTMENT_DATE = "2019-11-01"
 LAGARDE_COUNT_WINDOW_START = "2019-07-01"
@@ -36,16 +38,40 @@ def _require_columns(df: pd.DataFrame, name: str, cols: list[str]) -> None:
         raise ValueError(f"{name} missing required columns: {missing}")
 
 
-def run_analysis() -> None:
-    ensure_dirs()
+def _id_mask(ids: np.ndarray, n: int) -> np.ndarray:
+    # Row ids are positional, so membership is a direct index into a bool array.
+    mask = np.zeros(n, dtype=bool)
+    mask[ids[(ids >= 0) & (ids < n)]] = True
+    return mask
+
+
+def _nunique(s: pd.Series) -> int:
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        return int(s.nunique())
+    # Mark the categories whose codes occur; missing values (code -1) land in the spare last slot.
+    seen = np.zeros(len(s.cat.categories) + 1, dtype=bool)
+    seen[s.cat.codes.to_numpy()] = True
+    return int(seen[:-1].sum())
+
 
-    speeches = pd.read_csv(RAW / "speeches_raw.csv", low_memory=False).reset_index(drop=True)
-    minutes = pd.read_csv(RAW / "minutes_raw.csv", low_memory=False).reset_index(drop=True)
-    stage1_s = pd.read_csv(STAGE1 / "speeches_keyword_filtered.csv", low_memory=False)
-    stage1_m = pd.read_csv(STAGE1 / "minutes_keyword_filtered.csv", low_memory=False)
-    speech_verified = pd.read_csv(PROCESSED / "speeches_verified.csv", low_memory=False)
-    minute_verified = pd.read_csv(PROCESSED / "minutes_verified.csv", low_memory=False)
-    ex = pd.read_csv(CLASSIFIED / "excerpts_classified.csv", low_memory=False)
+def run_analysis(data: dict[str, pd.DataFrame] | None = None, force: bool = False) -> dict:
+    ensure_dirs()
+    outputs = [MAIN_NUMBERS, ANALYSIS / "within_institution_rates.csv"]
+    inputs = [*INPUT_PATHS.values(), Path(__file__)]
+    # Only outputs built from the input CSVs can be skipped; a caller's data is always used.
+    from_disk = data is None
+    if from_disk and not force and all(is_fresh(out, *inputs) for out in outputs):
+        return json.loads(MAIN_NUMBERS.read_text(encoding="utf-8"))
+    if from_disk:
+        data = load_all(refresh=force)
+
+    speeches = data["speeches_raw"].reset_index(drop=True)
+    minutes = data["minutes_raw"].reset_index(drop=True)
+    stage1_s = data["speeches_stage1"]
+    stage1_m = data["minutes_stage1"]
+    speech_verified = data["speeches_verified"]
+    minute_verified = data["minutes_verified"]
+    ex = data["excerpts_classified"]
 
     _require_columns(
         speeches,
@@ -70,67 +96,82 @@ def run_analysis() -> None:
 
     speeches_core = speeches[~speeches["institution_harmonised"].isin(EXCLUDED_NON_CENTRAL)].copy()
 
-    speech_ids_verified = set(ex.loc[ex["doc_type"] == "speech", "speech_id"].dropna().astype(int))
-    minute_ids_verified = set(ex.loc[ex["doc_type"] == "minute", "minute_id"].dropna().astype(int))
+    ex_speech = ex[ex["doc_type"] == "speech"]
+    ex_minute = ex[ex["doc_type"] == "minute"]
+
+    speech_ids_verified = ex_speech["speech_id"].dropna().to_numpy(np.int64)
+    minute_ids_verified = ex_minute["minute_id"].dropna().to_numpy(np.int64)
+    speech_verified_mask = pd.Series(_id_mask(speech_ids_verified, len(speeches)), index=speeches.index)
+    minute_verified_mask = pd.Series(_id_mask(minute_ids_verified, len(minutes)), index=minutes.index)
 
-    verified_speech_docs = int(ex.loc[ex["doc_type"] == "speech", "speech_id"].nunique())
-    verified_minute_docs = int(ex.loc[ex["doc_type"] == "minute", "minute_id"].nunique())
+    verified_speech_docs = int(ex_speech["speech_id"].nunique())
+    verified_minute_docs = int(ex_minute["minute_id"].nunique())
 
-    paired_rows = []
-    for inst in sorted(minutes["institution"].dropna().unique()):
-        s_sub = speeches[speeches["institution"] == inst]
-        m_sub = minutes[minutes["institution"] == inst]
-        if len(s_sub) == 0 or len(m_sub) == 0:
-            continue
-        paired_rows.append(
+    speech_ver = speech_verified_mask.groupby(speeches["institution"])
+    minute_ver = minute_verified_mask.groupby(minutes["institution"])
+    paired_df = (
+        pd.concat(
             {
-                "institution": inst,
-                "speech_rate": 100.0 * s_sub["speech_id"].isin(speech_ids_verified).sum() / len(s_sub),
-                "minute_rate": 100.0 * m_sub["minute_id"].isin(minute_ids_verified).sum() / len(m_sub),
-            }
+                "speech_rate": 100.0 * speech_ver.sum() / speech_ver.size(),
+                "minute_rate": 100.0 * minute_ver.sum() / minute_ver.size(),
+            },
+            axis=1,
+            join="inner",
         )
-    paired_df = pd.DataFrame(paired_rows)
+        .sort_index()
+        .rename_axis("institution")
+        .reset_index()
+    )
     t_res = stats.ttest_rel(paired_df["speech_rate"], paired_df["minute_rate"])
 
-    speech_levels = ex.loc[ex["doc_type"] == "speech", "level_score_final"].dropna()
-    minute_levels = ex.loc[ex["doc_type"] == "minute", "level_score_final"].dropna()
+    speech_levels = ex_speech["level_score_final"].dropna()
+    minute_levels = ex_minute["level_score_final"].dropna()
     u_stat, u_p = stats.mannwhitneyu(speech_levels, minute_levels, alternative="two-sided")
 
-    inst_submission = ex.loc[ex["doc_type"] == "speech", "institution"].copy()
+    # Replace on plain values: the categorical may not have "Federal Reserve" as a category.
+    inst_submission = ex_speech["institution"].astype(object)
     inst_submission = inst_submission.replace({"Board of Governors of the Federal Reserve": "Federal Reserve"})
 
-    ecb = minutes[minutes["institution"] == "European Central Bank"].copy()
-    ecb["date_dt"] = pd.to_datetime(ecb["Date"], errors="coerce")
-    ecb_lagarde_main = ecb[ecb["date_dt"] >= pd.Timestamp(LAGARDE_COUNT_WINDOW_START)]
-    ecb_lagarde_appointment_window = ecb[ecb["date_dt"] >= pd.Timestamp(LAGARDE_APPOINTMENT_DATE)]
-    ecb_ids = set(
-        ex.loc[(ex["doc_type"] == "minute") & (ex["institution"] == "European Central Bank"), "minute_id"]
+    ecb = minutes[minutes["institution"] == "European Central Bank"]
+    ecb_lagarde_main = ecb[ecb["Date"] >= pd.Timestamp(LAGARDE_COUNT_WINDOW_START)]
+    ecb_lagarde_appointment_window = ecb[ecb["Date"] >= pd.Timestamp(LAGARDE_APPOINTMENT_DATE)]
+    ecb_ids = (
+        ex_minute.loc[ex_minute["institution"] == "European Central Bank", "minute_id"]
         .dropna()
-        .astype(int)
+        .to_numpy(np.int64)
     )
+    ecb_verified_mask = _id_mask(ecb_ids, len(minutes))
+    ecb_lagarde_docs = int(ecb_verified_mask[ecb_lagarde_main["minute_id"].to_numpy()].sum())
+    ecb_lagarde_appointment_docs = int(ecb_verified_mask[ecb_lagarde_appointment_window["minute_id"].to_numpy()].sum())
+
+    speech_years = speeches["year"].agg(["min", "max"])
+    minute_years = minutes["year"].agg(["min", "max"])
+    stage1_speech_docs = int(stage1_s["speech_id"].nunique())
+    stage1_minute_docs = int(stage1_m["minute_id"].nunique())
+    level_label_counts = ex[["level_score_primary", "level_score_final"]].count()
 
     main_numbers = {
         "speech_total_core_sample": int(len(speeches_core)),
-        "speech_institutions_core_sample": int(speeches_core["institution_harmonised"].nunique()),
+        "speech_institutions_core_sample": _nunique(speeches_core["institution_harmonised"]),
         "minute_total": int(len(minutes)),
-        "minute_institutions": int(minutes["institution"].nunique()),
-        "speech_period_start": int(speeches["year"].min()),
-        "speech_period_end": int(speeches["year"].max()),
-        "minute_period_start": int(minutes["year"].min()),
-        "minute_period_end": int(minutes["year"].max()),
-        "minute_languages": int(minutes["Language"].nunique()),
-        "stage0_speech_docs": int(speeches["has_climate"].fillna(False).astype(bool).sum()),
-        "stage0_minute_docs": int(minutes["has_climate"].fillna(False).astype(bool).sum()),
-        "stage1_speech_docs": int(stage1_s["speech_id"].nunique()),
-        "stage1_minute_docs": int(stage1_m["minute_id"].nunique()),
+        "minute_institutions": _nunique(minutes["institution"]),
+        "speech_period_start": int(speech_years["min"]),
+        "speech_period_end": int(speech_years["max"]),
+        "minute_period_start": int(minute_years["min"]),
+        "minute_period_end": int(minute_years["max"]),
+        "minute_languages": _nunique(minutes["Language"]),
+        "stage0_speech_docs": int(speeches["has_climate"].sum()),
+        "stage0_minute_docs": int(minutes["has_climate"].sum()),
+        "stage1_speech_docs": stage1_speech_docs,
+        "stage1_minute_docs": stage1_minute_docs,
         "stage1_speech_excerpts": int(len(stage1_s)),
         "stage1_minute_excerpts": int(len(stage1_m)),
         "verified_speech_docs": verified_speech_docs,
         "verified_minute_docs": verified_minute_docs,
-        "verified_speech_excerpts": int((ex["doc_type"] == "speech").sum()),
-        "verified_minute_excerpts": int((ex["doc_type"] == "minute").sum()),
-        "speech_false_positive_rate_pct": round(100.0 * (1 - verified_speech_docs / stage1_s["speech_id"].nunique()), 1),
-        "minute_false_positive_rate_pct": round(100.0 * (1 - verified_minute_docs / stage1_m["minute_id"].nunique()), 1),
+        "verified_speech_excerpts": int(len(ex_speech)),
+        "verified_minute_excerpts": int(len(ex_minute)),
+        "speech_false_positive_rate_pct": round(100.0 * (1 - verified_speech_docs / stage1_speech_docs), 1),
+        "minute_false_positive_rate_pct": round(100.0 * (1 - verified_minute_docs / stage1_minute_docs), 1),
         "speech_rate_core_denom_pct": round(100.0 * verified_speech_docs / len(speeches_core), 1),
         "minute_rate_pct": round(100.0 * verified_minute_docs / len(minutes), 1),
         "gap_ratio": round((verified_speech_docs / len(speeches_core)) / (verified_minute_docs / len(minutes)), 1),
@@ -140,27 +181,34 @@ def run_analysis() -> None:
         "paired_t_p": round(float(t_res.pvalue), 3),
         "mannwhitney_u": float(u_stat),
         "mannwhitney_p": round(float(u_p), 3),
-        "speech_institutions_with_climate_submission_rule": int(inst_submission.nunique()),
-        "minute_institutions_with_climate": int(ex.loc[ex["doc_type"] == "minute", "institution"].nunique()),
-        "ecb_lagarde_docs": int(ecb_lagarde_main["minute_id"].isin(ecb_ids).sum()),
+        "speech_institutions_with_climate_submission_rule": _nunique(inst_submission),
+        "minute_institutions_with_climate": _nunique(ex_minute["institution"]),
+        "ecb_lagarde_docs": ecb_lagarde_docs,
         "ecb_lagarde_total": int(len(ecb_lagarde_main)),
-        "ecb_lagarde_rate_pct": round(100.0 * ecb_lagarde_main["minute_id"].isin(ecb_ids).sum() / len(ecb_lagarde_main), 1),
+        "ecb_lagarde_rate_pct": round(100.0 * ecb_lagarde_docs / len(ecb_lagarde_main), 1),
         "ecb_lagarde_count_window_start": LAGARDE_COUNT_WINDOW_START,
         "ecb_lagarde_appointment_date_marker": LAGARDE_APPOINTMENT_DATE,
         "ecb_lagarde_total_if_strict_appointment_window": int(len(ecb_lagarde_appointment_window)),
         "ecb_lagarde_rate_if_strict_appointment_window_pct": round(
-            100.0 * ecb_lagarde_appointment_window["minute_id"].isin(ecb_ids).sum() / len(ecb_lagarde_appointment_window), 1
+            100.0 * ecb_lagarde_appointment_docs / len(ecb_lagarde_appointment_window), 1
         ),
-        "primary_level_labels": int(ex["level_score_primary"].notna().sum()),
-        "final_level_labels": int(ex["level_score_final"].notna().sum()),
+        "primary_level_labels": int(level_label_counts["level_score_primary"]),
+        "final_level_labels": int(level_label_counts["level_score_final"]),
         "speech_verified_excerpts_file_rows": int(len(speech_verified)),
         "minute_verified_excerpts_file_rows": int(len(minute_verified)),
     }
 
-    with open(ANALYSIS / "main_numbers.json", "w", encoding="utf-8") as f:
+    with open(MAIN_NUMBERS, "w", encoding="utf-8") as f:
         json.dump(main_numbers, f, indent=2, sort_keys=True)
 
     paired_df.to_csv(ANALYSIS / "within_institution_rates.csv", index=False)
+    for out in outputs:
+        if from_disk:
+            mark_fresh(out, *inputs)
+        else:
+            mark_stale(out)
+
+    return main_numbers
 
 
 if __name__ == "__main__":
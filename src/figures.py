@@ -1,18 +1,35 @@
 from __future__ import annotations
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
+import matplotlib
+
+# Figures are only written to PDF, so skip GUI backend discovery (also keeps worker processes headless).
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+try:
+    from .io_cache import INPUT_PATHS, is_fresh, load_all, mark_fresh, mark_stale
+except ImportError:
+    from io_cache import INPUT_PATHS, is_fresh, load_all, mark_fresh, mark_stale
+
 ROOT = Path(__file__).resolve().parents[1]
-DATA = ROOT / "data"
 OUT = ROOT / "outputs"
-RAW = DATA / "raw"
-PROCESSED = DATA / "processed"
-CLASSIFIED = DATA / "classified"
 FIGURES = OUT / "figures"
 
+# Columns each figure input must provide; frames are projected to these before plotting.
+FIGURE_COLUMNS = {
+    "speeches_raw": ["year", "institution"],
+    "minutes_raw": ["year", "institution"],
+    "speeches_verified": ["year", "speech_id"],
+    "minutes_verified": ["year", "minute_id"],
+    "excerpts_classified": ["doc_type", "institution", "speech_id", "minute_id", "level_score_final", "year"],
+}
+
 COLORS = {
     "speech": "#8B3A3A",
     "minute": "#2F2F2F",
@@ -52,32 +69,25 @@ def setup_style() -> None:
     )
 
 
-def load_data() -> dict[str, pd.DataFrame]:
-    data = {
-        "speeches_raw": pd.read_csv(RAW / "speeches_raw.csv", low_memory=False),
-        "minutes_raw": pd.read_csv(RAW / "minutes_raw.csv", low_memory=False),
-        "speeches_verified": pd.read_csv(PROCESSED / "speeches_verified.csv", low_memory=False),
-        "minutes_verified": pd.read_csv(PROCESSED / "minutes_verified.csv", low_memory=False),
-        "excerpts_classified": pd.read_csv(CLASSIFIED / "excerpts_classified.csv", low_memory=False),
-    }
+def load_data(data: dict[str, pd.DataFrame] | None = None) -> dict[str, pd.DataFrame]:
+    if data is None:
+        data = load_all()
+    data = {key: data[key] for key in FIGURE_COLUMNS}
 
+    # Figures bin by the document date, so derive year on copies and leave the shared frames untouched.
     for key, df in data.items():
         if "Date" in df.columns:
-            df["date"] = pd.to_datetime(df["Date"], errors="coerce")
+            date = df["Date"]
         elif "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        if "date" in df.columns:
-            df["year"] = df["date"].dt.year
-
-    _require_columns(data["speeches_raw"], "speeches_raw.csv", ["year", "institution"])
-    _require_columns(data["minutes_raw"], "minutes_raw.csv", ["year", "institution"])
-    _require_columns(data["speeches_verified"], "speeches_verified.csv", ["year", "speech_id"])
-    _require_columns(data["minutes_verified"], "minutes_verified.csv", ["year", "minute_id"])
-    _require_columns(
-        data["excerpts_classified"],
-        "excerpts_classified.csv",
-        ["doc_type", "institution", "speech_id", "minute_id", "level_score_final"],
-    )
+            date = df["date"]
+        else:
+            continue
+        data[key] = df.assign(date=date, year=date.dt.year)
+
+    # Keep only what the figures read so the frames are cheap to ship to worker processes.
+    for key, cols in FIGURE_COLUMNS.items():
+        _require_columns(data[key], f"{key}.csv", cols)
+        data[key] = data[key][cols]
 
     return data
 
@@ -95,16 +105,8 @@ def fig1_temporal_trends(data: dict[str, pd.DataFrame]) -> None:
     minute_total_by_year = minutes_raw.groupby("year").size()
 
     years = range(1997, 2025)
-    speech_rates = []
-    minute_rates = []
-
-    for year in years:
-        sp_climate = speech_climate_by_year.get(year, 0)
-        sp_total = speech_total_by_year.get(year, 0)
-        mn_climate = minute_climate_by_year.get(year, 0)
-        mn_total = minute_total_by_year.get(year, 0)
-        speech_rates.append(100 * sp_climate / sp_total if sp_total > 0 else 0)
-        minute_rates.append(100 * mn_climate / mn_total if mn_total > 0 else 0)
+    speech_rates = (100 * speech_climate_by_year / speech_total_by_year).reindex(years).fillna(0)
+    minute_rates = (100 * minute_climate_by_year / minute_total_by_year).reindex(years).fillna(0)
 
     fig, ax = plt.subplots(figsize=(10, 5))
     ax.plot(years, speech_rates, color=COLORS["speech"], linewidth=2, marker="o", markersize=4, label="Speeches")
@@ -133,14 +135,14 @@ def fig11_temporal_commitment(data: dict[str, pd.DataFrame]) -> None:
     excerpts = data["excerpts_classified"]
 
     years = range(2000, 2025)
-    speech_levels = []
-    minute_levels = []
-
-    for year in years:
-        sp = excerpts[(excerpts["doc_type"] == "speech") & (excerpts["year"] == year)]["level_score_final"]
-        mn = excerpts[(excerpts["doc_type"] == "minute") & (excerpts["year"] == year)]["level_score_final"]
-        speech_levels.append(sp.mean() if len(sp) > 0 else np.nan)
-        minute_levels.append(mn.mean() if len(mn) > 0 else np.nan)
+    levels_by_year = (
+        excerpts.groupby(["year", "doc_type"])["level_score_final"]
+        .mean()
+        .unstack("doc_type")
+        .reindex(index=years, columns=["speech", "minute"])
+    )
+    speech_levels = levels_by_year["speech"]
+    minute_levels = levels_by_year["minute"]
 
     fig, ax = plt.subplots(figsize=(10, 5))
     ax.plot(years, speech_levels, color=COLORS["speech"], linewidth=2, marker="o", markersize=4, label="Speeches")
@@ -173,24 +175,27 @@ def fig6_lagarde_effect(data: dict[str, pd.DataFrame]) -> None:
     lagarde_start = 2019 + 10 / 12
 
     years = range(2010, 2025)
-    speech_rates = []
-    minute_rates = []
-    speech_commitment = []
-    minute_commitment = []
-
-    for year in years:
-        sp_total = len(ecb_speeches_raw[ecb_speeches_raw["year"] == year])
-        sp_climate = ecb_excerpts[(ecb_excerpts["doc_type"] == "speech") & (ecb_excerpts["year"] == year)]["speech_id"].nunique()
-        speech_rates.append(100 * sp_climate / sp_total if sp_total > 0 else np.nan)
+    by_doc_type = (
+        ecb_excerpts.groupby(["year", "doc_type"])
+        .agg(
+            speech_docs=("speech_id", "nunique"),
+            minute_docs=("minute_id", "nunique"),
+            level=("level_score_final", "mean"),
+        )
+        .unstack("doc_type")
+        .reindex(
+            index=years,
+            columns=pd.MultiIndex.from_product([["speech_docs", "minute_docs", "level"], ["speech", "minute"]]),
+        )
+    )
 
-        mn_total = len(ecb_minutes_raw[ecb_minutes_raw["year"] == year])
-        mn_climate = ecb_excerpts[(ecb_excerpts["doc_type"] == "minute") & (ecb_excerpts["year"] == year)]["minute_id"].nunique()
-        minute_rates.append(100 * mn_climate / mn_total if mn_total > 0 else np.nan)
+    sp_total = ecb_speeches_raw.groupby("year").size().reindex(years)
+    mn_total = ecb_minutes_raw.groupby("year").size().reindex(years)
+    speech_rates = 100 * by_doc_type["speech_docs"]["speech"].fillna(0) / sp_total
+    minute_rates = 100 * by_doc_type["minute_docs"]["minute"].fillna(0) / mn_total
 
-        sp_level = ecb_excerpts[(ecb_excerpts["doc_type"] == "speech") & (ecb_excerpts["year"] == year)]["level_score_final"].mean()
-        mn_level = ecb_excerpts[(ecb_excerpts["doc_type"] == "minute") & (ecb_excerpts["year"] == year)]["level_score_final"].mean()
-        speech_commitment.append(sp_level)
-        minute_commitment.append(mn_level)
+    speech_commitment = by_doc_type["level"]["speech"]
+    minute_commitment = by_doc_type["level"]["minute"]
 
     fig, axes = plt.subplots(1, 2, figsize=(12, 5))
 
@@ -229,8 +234,8 @@ def fig_commitment_grouped(data: dict[str, pd.DataFrame]) -> None:
 
     levels_numeric = [1.0, 1.5, 2.0, 2.5, 3.0]
     levels = ["1.0\n(Observ.)", "1.5", "2.0\n(Intent.)", "2.5", "3.0\n(Oper.)"]
-    speech_pct = [round(100.0 * (speech == lv).mean(), 1) for lv in levels_numeric]
-    minute_pct = [round(100.0 * (minute == lv).mean(), 1) for lv in levels_numeric]
+    speech_pct = speech.value_counts(normalize=True).reindex(levels_numeric, fill_value=0).mul(100).round(1).tolist()
+    minute_pct = minute.value_counts(normalize=True).reindex(levels_numeric, fill_value=0).mul(100).round(1).tolist()
 
     speech_n = int(len(speech))
     minute_n = int(len(minute))
@@ -279,47 +284,27 @@ def fig_commitment_grouped(data: dict[str, pd.DataFrame]) -> None:
     plt.close(fig)
 
 
+def _first_mention_year(excerpts: pd.DataFrame, id_col: str, years: pd.Series) -> pd.Series:
+    # Document ids are row positions in the raw frame, so years are gathered by position instead of merged.
+    doc_years = years.reset_index(drop=True).reindex(excerpts[id_col]).set_axis(excerpts.index)
+    return doc_years.groupby(excerpts["institution"]).min()
+
+
 # Figure quality-lag b
 def fig_first_mention_lag(data: dict[str, pd.DataFrame]) -> None:
     ex = data["excerpts_classified"]
-    speeches_raw = data["speeches_raw"].reset_index(drop=True).copy()
-    minutes_raw = data["minutes_raw"].reset_index(drop=True).copy()
-    speeches_raw["speech_id"] = speeches_raw.index.astype(int)
-    minutes_raw["minute_id"] = minutes_raw.index.astype(int)
-
-    speech_first = (
-        ex[ex["doc_type"] == "speech"][["institution", "speech_id"]]
-        .drop_duplicates()
-        .merge(speeches_raw[["speech_id", "year"]], on="speech_id", how="left")
-        .groupby("institution")["year"]
-        .min()
+    speech_first = _first_mention_year(ex[ex["doc_type"] == "speech"], "speech_id", data["speeches_raw"]["year"])
+    minute_first = _first_mention_year(ex[ex["doc_type"] == "minute"], "minute_id", data["minutes_raw"]["year"])
+
+    common = speech_first.index.intersection(minute_first.index).sort_values()
+    lag_df = (
+        pd.concat({"first_speech": speech_first.loc[common], "first_minute": minute_first.loc[common]}, axis=1)
+        .dropna()
+        .astype(int)
     )
-    minute_first = (
-        ex[ex["doc_type"] == "minute"][["institution", "minute_id"]]
-        .drop_duplicates()
-        .merge(minutes_raw[["minute_id", "year"]], on="minute_id", how="left")
-        .groupby("institution")["year"]
-        .min()
-    )
-
-    common = sorted(set(speech_first.index) & set(minute_first.index))
-    rows = []
-    for inst in common:
-        sp = speech_first.get(inst)
-        mn = minute_first.get(inst)
-        if pd.isna(sp) or pd.isna(mn):
-            continue
-        rows.append(
-            {
-                "institution": inst,
-                "first_speech": int(sp),
-                "first_minute": int(mn),
-                "lag": int(mn - sp),
-            }
-        )
-
-    data = sorted(rows, key=lambda x: x["lag"], reverse=True)
-    mean_lag = sum(d["lag"] for d in data) / len(data)
+    lag_df["lag"] = lag_df["first_minute"] - lag_df["first_speech"]
+    lag_df = lag_df.sort_values("lag", ascending=False, kind="stable")
+    mean_lag = lag_df["lag"].mean()
 
     name_map = {
         "Federal Reserve": "Federal Reserve",
@@ -337,26 +322,26 @@ def fig_first_mention_lag(data: dict[str, pd.DataFrame]) -> None:
     }
 
     fig, ax = plt.subplots(figsize=(8, 6))
-    y_pos = np.arange(len(data))
+    y_pos = np.arange(len(lag_df))
+    rows = list(lag_df.itertuples())
 
-    for i, d in enumerate(data):
-        ax.hlines(y=i, xmin=0, xmax=d["lag"], color=COLORS["minute"], alpha=0.3, linewidth=1.5)
+    for i, d in enumerate(rows):
+        ax.hlines(y=i, xmin=0, xmax=d.lag, color=COLORS["minute"], alpha=0.3, linewidth=1.5)
 
-    lags = [d["lag"] for d in data]
-    ax.scatter(lags, y_pos, color=COLORS["speech"], s=80, zorder=3, edgecolor="white", linewidth=0.5)
+    ax.scatter(lag_df["lag"].tolist(), y_pos, color=COLORS["speech"], s=80, zorder=3, edgecolor="white", linewidth=0.5)
 
-    for i, d in enumerate(data):
-        ax.text(d["lag"] + 0.8, i, f"{d['lag']}y", va="center", ha="left", fontsize=9, color=COLORS["speech"])
+    for i, d in enumerate(rows):
+        ax.text(d.lag + 0.8, i, f"{d.lag}y", va="center", ha="left", fontsize=9, color=COLORS["speech"])
 
-    for i, d in enumerate(data):
-        ax.text(-1, i, f"({d['first_speech']}-{d['first_minute']})", va="center", ha="right", fontsize=7, color="gray")
+    for i, d in enumerate(rows):
+        ax.text(-1, i, f"({d.first_speech}-{d.first_minute})", va="center", ha="right", fontsize=7, color="gray")
 
     ax.set_yticks(y_pos)
-    ax.set_yticklabels([name_map.get(d["institution"], d["institution"]) for d in data])
+    ax.set_yticklabels([name_map.get(d.Index, d.Index) for d in rows])
     ax.set_xlabel("Years Between First Speech and First Minutes Mention")
 
     ax.axvline(x=mean_lag, color=COLORS["speech"], linestyle="--", alpha=0.5, linewidth=1)
-    ax.text(mean_lag + 0.5, len(data) - 0.5, f"Mean: {mean_lag:.1f}y", fontsize=9, color=COLORS["speech"], va="bottom")
+    ax.text(mean_lag + 0.5, len(lag_df) - 0.5, f"Mean: {mean_lag:.1f}y", fontsize=9, color=COLORS["speech"], va="bottom")
 
     ax.set_xlim(-8, 35)
     ax.invert_yaxis()
@@ -368,15 +353,34 @@ def fig_first_mention_lag(data: dict[str, pd.DataFrame]) -> None:
     plt.close(fig)
 
 
-def run_figures() -> None:
+def run_figures(data: dict[str, pd.DataFrame] | None = None, force: bool = False) -> None:
     ensure_dirs()
-    setup_style()
-    data = load_data()
-    fig1_temporal_trends(data)
-    fig11_temporal_commitment(data)
-    fig6_lagarde_effect(data)
-    fig_commitment_grouped(data)
-    fig_first_mention_lag(data)
+    figure_fns = [
+        fig1_temporal_trends,
+        fig11_temporal_commitment,
+        fig6_lagarde_effect,
+        fig_commitment_grouped,
+        fig_first_mention_lag,
+    ]
+    # Each figure is written to <function name>.pdf. When drawing from the input CSVs, skip the
+    # ones whose inputs are unchanged since they were built; a caller's data is always used.
+    inputs = [*(INPUT_PATHS[key] for key in FIGURE_COLUMNS), Path(__file__)]
+    from_disk = data is None
+    if from_disk and not force:
+        figure_fns = [fn for fn in figure_fns if not is_fresh(FIGURES / f"{fn.__name__}.pdf", *inputs)]
+        if not figure_fns:
+            return
+
+    data = load_data(load_all(refresh=force) if from_disk else data)
+    # Each figure writes its own PDF, so they render independently in separate processes.
+    with ProcessPoolExecutor(max_workers=min(len(figure_fns), os.cpu_count() or 1), initializer=setup_style) as pool:
+        futures = {fn: pool.submit(fn, data) for fn in figure_fns}
+        for fn, future in futures.items():
+            future.result()
+            if from_disk:
+                mark_fresh(FIGURES / f"{fn.__name__}.pdf", *inputs)
+            else:
+                mark_stale(FIGURES / f"{fn.__name__}.pdf")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from functools import cache
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA = ROOT / "data"
+RAW = DATA / "raw"
+PROCESSED = DATA / "processed"
+STAGE1 = DATA / "stage1"
+CLASSIFIED = DATA / "classified"
+# Size and mtime of the inputs each output was last built from, keyed by output path.
+OUTPUT_MANIFEST = ROOT / "outputs" / ".input_signatures.json"
+
+INPUT_PATHS = {
+    "speeches_raw": RAW / "speeches_raw.csv",
+    "minutes_raw": RAW / "minutes_raw.csv",
+    "speeches_stage1": STAGE1 / "speeches_keyword_filtered.csv",
+    "minutes_stage1": STAGE1 / "minutes_keyword_filtered.csv",
+    "speeches_verified": PROCESSED / "speeches_verified.csv",
+    "minutes_verified": PROCESSED / "minutes_verified.csv",
+    "excerpts_classified": CLASSIFIED / "excerpts_classified.csv",
+}
+
+CATEGORICAL_COLUMNS = {"institution", "institution_harmonised", "Language", "doc_type"}
+DATE_COLUMNS = {"Date", "date"}
+
+# pd.read_csv's default missing-value tokens; Arrow's defaults omit "<NA>" and "None".
+NA_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+# Columns the analysis, tables and figures read from each input; everything else stays on disk.
+LOAD_COLUMNS = {
+    "speeches_raw": ["Date", "date", "year", "institution", "institution_harmonised", "has_climate"],
+    "minutes_raw": ["Date", "date", "year", "institution", "Language", "has_climate"],
+    "speeches_stage1": ["speech_id"],
+    "minutes_stage1": ["minute_id"],
+    "speeches_verified": ["date", "year", "speech_id"],
+    "minutes_verified": ["date", "year", "minute_id"],
+    "excerpts_classified": [
+        "date",
+        "year",
+        "doc_type",
+        "institution",
+        "speech_id",
+        "minute_id",
+        "level_score_primary",
+        "level_score_final",
+    ],
+}
+
+
+def _apply_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.astype({c: "category" for c in CATEGORICAL_COLUMNS & set(df.columns)})
+    for col in DATE_COLUMNS & set(df.columns):
+        # Arrow already types ISO dates; anything it left as text is parsed here, once per sidecar.
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    if "year" in df.columns:
+        df["year"] = pd.to_numeric(df["year"], downcast="integer")
+    return df
+
+
+# Sidecars store the dtypes applied by this module, so they are tied to its exact source.
+LOADER_DIGEST = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+SIDECAR_METADATA_KEY = b"naturecc.source"
+
+
+def file_signature(path: Path) -> list[int]:
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _read_schema(parquet_path: Path) -> pa.Schema | None:
+    try:
+        return pq.read_schema(parquet_path)
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def _write_sidecar(table: pa.Table, parquet_path: Path) -> None:
+    # Written beside the target and renamed into place, so an interrupted run never leaves a
+    # truncated sidecar behind. A read-only data directory just means running uncached.
+    try:
+        fd, tmp_name = tempfile.mkstemp(dir=parquet_path.parent, prefix=f".{parquet_path.name}.", suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            pq.write_table(table, fh, compression="zstd")
+        os.replace(tmp_name, parquet_path)
+    except OSError:
+        Path(tmp_name).unlink(missing_ok=True)
+
+
+def load_cached(csv_path: Path, columns: list[str] | None = None, refresh: bool = False) -> pd.DataFrame:
+    """Read a CSV through a Parquet sidecar that is rebuilt whenever the CSV or this module changes.
+
+    The sidecar records the CSV's size and mtime and is reused only on an exact match, so a
+    replacement file is picked up even if it carries an older timestamp. The sidecar always
+    holds every column; ``columns`` only projects what is returned, and names absent from the
+    file are skipped so callers can report missing columns themselves. ``refresh`` re-parses
+    the CSV and rewrites the sidecar regardless.
+    """
+    parquet_path = csv_path.with_suffix(".parquet")
+    stamp = json.dumps({"csv": file_signature(csv_path), "loader": LOADER_DIGEST}).encode()
+    schema = _read_schema(parquet_path)
+    if not refresh and schema is not None and (schema.metadata or {}).get(SIDECAR_METADATA_KEY) == stamp:
+        if columns is not None:
+            columns = [c for c in columns if c in schema.names]
+        return pd.read_parquet(parquet_path, engine="pyarrow", columns=columns)
+
+    table = pv.read_csv(
+        csv_path,
+        parse_options=pv.ParseOptions(newlines_in_values=True),
+        # Blank and NA-token string fields become nulls, as they do under pd.read_csv.
+        convert_options=pv.ConvertOptions(null_values=NA_VALUES, strings_can_be_null=True, quoted_strings_can_be_null=True),
+    )
+    # Nullable booleans keep missing flags as <NA> instead of falling back to object columns.
+    df = table.to_pandas(date_as_object=False, self_destruct=True, types_mapper={pa.bool_(): pd.BooleanDtype()}.get)
+    df = _apply_dtypes(df)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, SIDECAR_METADATA_KEY: stamp})
+    _write_sidecar(table, parquet_path)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+
+def _input_signatures(inputs: tuple[Path, ...]) -> dict[str, list[int]]:
+    return {str(p): file_signature(p) for p in (*inputs, Path(__file__))}
+
+
+def _read_manifest() -> dict[str, dict[str, list[int]]]:
+    try:
+        return json.loads(OUTPUT_MANIFEST.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest: dict[str, dict[str, list[int]]]) -> None:
+    OUTPUT_MANIFEST.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def is_fresh(out: Path, *inputs: Path) -> bool:
+    """True if ``out`` exists and was built from inputs whose size and mtime are unchanged.
+
+    This loader module counts as an input. Any difference, including an older timestamp,
+    makes the output stale.
+    """
+    return out.exists() and _read_manifest().get(str(out)) == _input_signatures(inputs)
+
+
+def mark_fresh(out: Path, *inputs: Path) -> None:
+    manifest = _read_manifest()
+    manifest[str(out)] = _input_signatures(inputs)
+    _write_manifest(manifest)
+
+
+def mark_stale(out: Path) -> None:
+    manifest = _read_manifest()
+    if manifest.pop(str(out), None) is not None:
+        _write_manifest(manifest)
+
+
+@cache
+def load_all(refresh: bool = False) -> dict[str, pd.DataFrame]:
+    # Cached so every stage that needs data in one run shares a single load; stages that are
+    # up to date never trigger it. Callers must not mutate the returned frames.
+    return {key: load_cached(path, LOAD_COLUMNS[key], refresh) for key, path in INPUT_PATHS.items()}
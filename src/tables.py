@@ -1,20 +1,18 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 
 import pandas as pd
 
 try:
-    from .analysis import run_analysis
+    from .analysis import MAIN_NUMBERS, run_analysis
+    from .io_cache import INPUT_PATHS, is_fresh, load_all, mark_fresh, mark_stale
 except ImportError:
-    from analysis import run_analysis
+    from analysis import MAIN_NUMBERS, run_analysis
+    from io_cache import INPUT_PATHS, is_fresh, load_all, mark_fresh, mark_stale
 
 ROOT = Path(__file__).resolve().parents[1]
-DATA = ROOT / "data"
 OUT = ROOT / "outputs"
-RAW = DATA / "raw"
-CLASSIFIED = DATA / "classified"
 ANALYSIS = OUT / "analysis"
 TABLES = OUT / "tables"
 
@@ -60,9 +58,9 @@ def table1_overview(main_numbers: dict) -> pd.DataFrame:
 
 
 # Table 2
-def table2_institution_heterogeneity() -> pd.DataFrame:
-    minutes = pd.read_csv(RAW / "minutes_raw.csv", low_memory=False).reset_index(drop=True)
-    ex = pd.read_csv(CLASSIFIED / "excerpts_classified.csv", low_memory=False)
+def table2_institution_heterogeneity(data: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    minutes = data["minutes_raw"].reset_index(drop=True)
+    ex = data["excerpts_classified"]
 
     minutes["minute_id"] = minutes.index.astype(int)
 
@@ -81,57 +79,59 @@ def table2_institution_heterogeneity() -> pd.DataFrame:
 
     left = pd.concat([doc_counts, excerpt_counts, climate_doc_years], axis=1).reset_index()
     left = left.sort_values(["docs", "institution"], ascending=[False, True]).reset_index(drop=True)
-    def _period_str(r: pd.Series) -> str:
-        if pd.isna(r["period_start"]) or pd.isna(r["period_end"]):
-            return ""
-        return f"{int(r['period_start'])}-{int(r['period_end'])}"
 
-    left["period"] = left.apply(_period_str, axis=1)
+    has_period = left[["period_start", "period_end"]].notna().all(axis=1)
+    period = left["period_start"].astype("Int64").astype(str) + "-" + left["period_end"].astype("Int64").astype(str)
+    left["period"] = period.where(has_period, "")
 
     climate_institutions = set(left["institution"])
     right = minutes[~minutes["institution"].isin(climate_institutions)].groupby("institution").size().rename("total_minutes").reset_index()
     right = right.sort_values(["total_minutes", "institution"], ascending=[False, True]).reset_index(drop=True)
 
-    n = max(len(left), len(right))
-    rows = []
-    for i in range(n):
-        l = left.iloc[i] if i < len(left) else None
-        r = right.iloc[i] if i < len(right) else None
-        rows.append(
-            {
-                "climate_institution": l["institution"] if l is not None else "",
-                "climate_docs": int(l["docs"]) if l is not None else "",
-                "climate_excerpts": int(l["excerpts"]) if l is not None else "",
-                "climate_period": l["period"] if l is not None else "",
-                "no_climate_institution": r["institution"] if r is not None else "",
-                "no_climate_total_minutes": int(r["total_minutes"]) if r is not None else "",
-            }
-        )
-
-    rows.append(
-        {
-            "climate_institution": "TOTAL",
-            "climate_docs": int(left["docs"].sum()),
-            "climate_excerpts": int(left["excerpts"].sum()),
-            "climate_period": "",
-            "no_climate_institution": "TOTAL",
-            "no_climate_total_minutes": int(right["total_minutes"].sum()),
-        }
+    # Side-by-side layout: the shorter column block is padded with blanks by aligning on row position.
+    out = pd.concat(
+        [
+            left[["institution", "docs", "excerpts", "period"]].astype({"docs": "Int64", "excerpts": "Int64"}).add_prefix("climate_"),
+            right[["institution", "total_minutes"]].astype({"total_minutes": "Int64"}).add_prefix("no_climate_"),
+        ],
+        axis=1,
     )
 
-    return pd.DataFrame(rows)
+    total_row = {
+        "climate_institution": "TOTAL",
+        "climate_docs": int(left["docs"].sum()),
+        "climate_excerpts": int(left["excerpts"].sum()),
+        "climate_period": "",
+        "no_climate_institution": "TOTAL",
+        "no_climate_total_minutes": int(right["total_minutes"].sum()),
+    }
 
+    return pd.concat([out, pd.DataFrame([total_row])], ignore_index=True)
 
-def run_tables() -> None:
-    ensure_dirs()
-    run_analysis()
-    main_numbers = json.loads((ANALYSIS / "main_numbers.json").read_text(encoding="utf-8"))
 
-    t1 = table1_overview(main_numbers)
-    t2 = table2_institution_heterogeneity()
-
-    t1.to_csv(TABLES / "table1_overview.csv", index=False)
-    t2.to_csv(TABLES / "table2_institution_heterogeneity.csv", index=False)
+def run_tables(data: dict[str, pd.DataFrame] | None = None, force: bool = False) -> None:
+    ensure_dirs()
+    main_numbers = run_analysis(data, force)
+    # Only tables built from the input CSVs can be skipped; a caller's data is always used.
+    from_disk = data is None
+
+    t1_path = TABLES / "table1_overview.csv"
+    t1_inputs = [MAIN_NUMBERS, Path(__file__)]
+    if force or not (from_disk and is_fresh(t1_path, *t1_inputs)):
+        table1_overview(main_numbers).to_csv(t1_path, index=False)
+        if from_disk:
+            mark_fresh(t1_path, *t1_inputs)
+        else:
+            mark_stale(t1_path)
+
+    t2_path = TABLES / "table2_institution_heterogeneity.csv"
+    t2_inputs = [INPUT_PATHS["minutes_raw"], INPUT_PATHS["excerpts_classified"], Path(__file__)]
+    if force or not (from_disk and is_fresh(t2_path, *t2_inputs)):
+        table2_institution_heterogeneity(load_all(refresh=force) if from_disk else data).to_csv(t2_path, index=False)
+        if from_disk:
+            mark_fresh(t2_path, *t2_inputs)
+        else:
+            mark_stale(t2_path)
 
 
 if __name__ == "__main__":
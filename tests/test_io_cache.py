@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from src.io_cache import CLASSIFIED, PROCESSED, STAGE1, load_cached
+
+# Raw inputs are stored in Git LFS, so only the processed, stage-1 and classified files are checked.
+SHIPPED_CSVS = [
+    STAGE1 / "speeches_keyword_filtered.csv",
+    STAGE1 / "minutes_keyword_filtered.csv",
+    PROCESSED / "speeches_verified.csv",
+    PROCESSED / "minutes_verified.csv",
+    CLASSIFIED / "excerpts_classified.csv",
+]
+
+
+class LoadCachedNullsTest(unittest.TestCase):
+    def test_first_read_matches_pandas_null_counts(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            for csv_path in SHIPPED_CSVS:
+                with self.subTest(csv=csv_path.name):
+                    # Read a copy so no sidecar is written into data/.
+                    copy = Path(tmp) / csv_path.name
+                    shutil.copy(csv_path, copy)
+                    expected = pd.read_csv(csv_path, low_memory=False).isna().sum()
+                    actual = load_cached(copy).isna().sum()
+                    pd.testing.assert_series_equal(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()